@@ -516,18 +516,26 @@ class AllocationStatsAggregator
             num_largest = d_size_and_count_by_location.size();
         }
 
-        std::vector<std::pair<uint64_t, std::optional<frame_id_t>>> heap;
-        heap.reserve(d_size_and_count_by_location.size());
-        for (auto it : d_size_and_count_by_location) {
-            auto location = it.first;
-            auto val = std::get<field>(it.second);
-            heap.push_back({val, location});
-        }
-        std::make_heap(heap.begin(), heap.end());
-        for (size_t i = 0; i < num_largest; ++i) {
-            std::pop_heap(heap.begin(), heap.end() - i);
+        // Keep a min-heap of the num_largest biggest entries seen so far, so
+        // that we never need to copy every location into a temporary vector.
+        using entry_t = std::pair<uint64_t, std::optional<frame_id_t>>;
+        const auto cmp = std::greater<entry_t>();
+        std::vector<entry_t> heap;
+        heap.reserve(num_largest);
+        for (const auto& it : d_size_and_count_by_location) {
+            entry_t entry{std::get<field>(it.second), it.first};
+            if (heap.size() < num_largest) {
+                heap.push_back(entry);
+                std::push_heap(heap.begin(), heap.end(), cmp);
+            } else if (cmp(entry, heap.front())) {
+                std::pop_heap(heap.begin(), heap.end(), cmp);
+                heap.back() = entry;
+                std::push_heap(heap.begin(), heap.end(), cmp);
+            }
         }
-        return {heap.rbegin(), heap.rbegin() + num_largest};
+        // Sorting a min-heap with the same comparator leaves it largest first.
+        std::sort_heap(heap.begin(), heap.end(), cmp);
+        return heap;
     }
 };
 
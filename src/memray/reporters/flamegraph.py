@@ -1,4 +1,5 @@
 import collections
+import functools
 import html
 import itertools
 import linecache
@@ -70,6 +71,12 @@ class FlameGraphNodeDict(TypedDict):
     import_system: List[int]
 
 
+# The location strings end up in the HTML tooltips built on the client side,
+# so they must be escaped here. The same function and file names show up in
+# many nodes, though, so only escape each distinct string once.
+_escape = functools.lru_cache(maxsize=4096)(html.escape)
+
+
 def create_framegraph_node_from_stack_frame(
     stack_frame: StackFrame,
     thread_id: str,
@@ -85,7 +92,7 @@ def create_framegraph_node_from_stack_frame(
     )
     return {
         "name": name,
-        "location": (html.escape(function), html.escape(filename), lineno),
+        "location": (_escape(function), _escape(filename), lineno),
         "value": 0,
         "children": [],
         "n_allocations": 0,
@@ -264,13 +271,14 @@ class FlameGraphReporter:
 
         unique_threads: Set[str] = set()
         for record in allocations:
-            unique_threads.add(format_thread_name(record))
+            thread_name = format_thread_name(record)
+            unique_threads.add(thread_name)
 
             record_data: RecordData
             if temporal:
                 assert isinstance(record, TemporalAllocationRecord)
                 record_data = {
-                    "thread_name": format_thread_name(record),
+                    "thread_name": thread_name,
                     "intervals": record.intervals,
                     "size": None,
                     "n_allocations": None,
@@ -278,7 +286,7 @@ class FlameGraphReporter:
             else:
                 assert not isinstance(record, TemporalAllocationRecord)
                 record_data = {
-                    "thread_name": format_thread_name(record),
+                    "thread_name": thread_name,
                     "intervals": None,
                     "size": record.size,
                     "n_allocations": record.n_allocations,
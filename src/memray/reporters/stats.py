@@ -1,8 +1,9 @@
 import datetime
+import io
 import json
 import math
-from collections import Counter
 from dataclasses import asdict
+from operator import itemgetter
 from pathlib import Path
 from typing import Any
 from typing import Dict
@@ -20,22 +21,36 @@ PythonStackElement = Tuple[str, str, int]
 
 
 def get_histogram_databins(data: Dict[int, int], bins: int) -> List[Tuple[int, int]]:
+    databins, _, _ = _get_histogram_databins_and_range(data, bins)
+    return databins
+
+
+def _get_histogram_databins_and_range(
+    data: Dict[int, int], bins: int
+) -> Tuple[List[Tuple[int, int]], int, int]:
+    """Like get_histogram_databins, but also return the smallest and largest size."""
     if bins <= 0:
         raise ValueError(f"Invalid input bins={bins}, should be greater than 0")
 
-    low = math.log(min(filter(None, data)))
-    high = math.log(max(data))
+    # Take the logarithm of each distinct size only once: it's needed both to
+    # find the range of the histogram and to place each size into a bucket.
+    log_counts = [(math.log(size), size, count) for size, count in data.items() if size]
+
+    low, min_size, _ = min(log_counts)
+    high, max_size, _ = max(log_counts)
     if low == high:
         low = low / 2
     step = (high - low) / bins
 
     # Determine the upper bound in bytes for each bin
     steps = [int(math.exp(low + step * (i + 1))) for i in range(bins)]
-    dist: Dict[int, int] = Counter()
-    for size, count in data.items():
-        bucket = min(int((math.log(size) - low) // step), bins - 1) if size else 0
-        dist[bucket] += count
-    return [(steps[b], dist[b]) for b in range(bins)]
+    dist = [0] * bins
+    if 0 in data:
+        dist[0] = data[0]
+        min_size = 0
+    for log_size, _, count in log_counts:
+        dist[min(int((log_size - low) // step), bins - 1)] += count
+    return [(steps[b], dist[b]) for b in range(bins)], min_size, max_size
 
 
 def describe_histogram_databins(
@@ -69,7 +84,7 @@ def draw_histogram(
             " should be greater than 0"
         )
 
-    data_bins = get_histogram_databins(data, bins=bins)
+    data_bins, min_size, max_size = _get_histogram_databins_and_range(data, bins)
     max_data_bin = max([t[1] for t in data_bins])
     scaled_data_bins = [
         math.ceil((v / max_data_bin) * hist_scale_factor) for _, v in data_bins
@@ -86,21 +101,21 @@ def draw_histogram(
         + hist_scale_factor
     )
 
-    result = []
-    result.append(f"min: {size_fmt(min(data))}")
-    result.append("\n\t")
-    result.append("-" * hist_width_total)
-    result.append("\n\t")
-    for i in range(len(scaled_data_bins)):
-        rel_op = "<=" if i == len(scaled_data_bins) - 1 else "< "
-        result.append(f"{rel_op}{size_fmt(data_bins[i][0]):<{size_max_width}}:")
-        result.append(f" {data_bins[i][1]:>{freq_max_width}} ")
-        result.append("▇" * scaled_data_bins[i])
-        result.append("\n\t")
-    result.append("-" * hist_width_total)
-    result.append(f"\n\tmax: {size_fmt(max(data))}")
+    separator = "-" * hist_width_total
+    last_bin = len(data_bins) - 1
+    result = io.StringIO()
+    result.write(f"min: {size_fmt(min_size)}\n\t{separator}\n\t")
+    for i, ((upper_bound, count), bar_length) in enumerate(
+        zip(data_bins, scaled_data_bins)
+    ):
+        rel_op = "<=" if i == last_bin else "< "
+        result.write(
+            f"{rel_op}{size_fmt(upper_bound):<{size_max_width}}:"
+            f" {count:>{freq_max_width}} {'▇' * bar_length}\n\t"
+        )
+    result.write(f"{separator}\n\tmax: {size_fmt(max_size)}")
 
-    return "".join(result)
+    return result.getvalue()
 
 
 class StatsReporter:
@@ -209,7 +224,7 @@ class StatsReporter:
     def _get_allocator_type_distribution(self) -> Iterator[Tuple[str, int]]:
         for allocator_name, count in sorted(
             self._stats.allocation_count_by_allocator.items(),
-            key=lambda item: item[1],
+            key=itemgetter(1),
             reverse=True,
         ):
             yield (allocator_name, count)
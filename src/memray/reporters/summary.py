@@ -1,12 +1,16 @@
+import bisect
+import heapq
 import os
+from operator import attrgetter
 from typing import IO
 from typing import Iterable
 from typing import Optional
+from typing import Sequence
 
 from rich import print as rprint
-from rich.markup import escape
 from rich.table import Column
 from rich.table import Table
+from rich.text import Text
 
 from memray import AllocationRecord
 from memray._memray import size_fmt
@@ -23,15 +27,13 @@ def _get_terminal_lines() -> int:
         return DEFAULT_TERMINAL_LINES
 
 
+# A proportion strictly above _SIZE_COLOR_THRESHOLDS[i] gets _SIZE_COLORS[i + 1]
+_SIZE_COLOR_THRESHOLDS = (0.05, 0.2, 0.6)
+_SIZE_COLORS = ("bright_green", "green", "yellow", "red")
+
+
 def _size_to_color(proportion_of_total: float) -> str:
-    if proportion_of_total > 0.6:
-        return "red"
-    elif proportion_of_total > 0.2:
-        return "yellow"
-    elif proportion_of_total > 0.05:
-        return "green"
-    else:
-        return "bright_green"
+    return _SIZE_COLORS[bisect.bisect_left(_SIZE_COLOR_THRESHOLDS, proportion_of_total)]
 
 
 class SummaryReporter:
@@ -46,9 +48,16 @@ class SummaryReporter:
     N_COLUMNS = len(KEY_TO_COLUMN_NAME)
 
     def __init__(self, data: Iterable[AllocationRecord], native: bool):
-        snapshot = tuple(data)
-        self.current_memory_size = sum(record.size for record in snapshot)
-        self.total_allocations = sum(record.n_allocations for record in snapshot)
+        snapshot: Sequence[AllocationRecord] = (
+            data if isinstance(data, (list, tuple)) else tuple(data)
+        )
+        current_memory_size = 0
+        total_allocations = 0
+        for record in snapshot:
+            current_memory_size += record.size
+            total_allocations += record.n_allocations
+        self.current_memory_size = current_memory_size
+        self.total_allocations = total_allocations
         self.snapshot_data = aggregate_allocations(
             snapshot,
             MAX_MEMORY_RATIO * self.current_memory_size,
@@ -84,15 +93,17 @@ class SummaryReporter:
         )
         table.columns[sort_column].header = f"<{table.columns[sort_column].header}>"
 
-        sorted_allocations = sorted(
+        get_sort_value = attrgetter(self.KEY_TO_COLUMN_NAME[sort_column])
+        sorted_allocations = heapq.nlargest(
+            max_rows,
             self.snapshot_data.items(),
-            key=lambda item: getattr(item[1], self.KEY_TO_COLUMN_NAME[sort_column]),
-            reverse=True,
-        )[:max_rows]
+            key=lambda item: get_sort_value(item[1]),
+        )
         for location, result in sorted_allocations:
-            color_location = (
-                f"[bold magenta]{escape(location.function)}[/] at "
-                f"[cyan]{escape(location.file)}[/]"
+            # Build styled Text objects directly rather than markup strings that
+            # Rich would have to parse back apart when rendering the table.
+            color_location = Text.assemble(
+                (location.function, "bold magenta"), " at ", (location.file, "cyan")
             )
             total_color = _size_to_color(result.total_memory / self.current_memory_size)
             own_color = _size_to_color(result.own_memory / self.current_memory_size)
@@ -103,11 +114,11 @@ class SummaryReporter:
             percent_own = result.own_memory / self.current_memory_size * 100
             table.add_row(
                 color_location,
-                f"[{total_color}]{size_fmt(result.total_memory)}[/{total_color}]",
-                f"[{total_color}]{percent_total:.2f}%[/{total_color}]",
-                f"[{own_color}]{size_fmt(result.own_memory)}[/{own_color}]",
-                f"[{own_color}]{percent_own:.2f}%[/{own_color}]",
-                f"[{allocation_colors}]{result.n_allocations}[/{allocation_colors}]",
+                Text(size_fmt(result.total_memory), style=total_color),
+                Text(f"{percent_total:.2f}%", style=total_color),
+                Text(size_fmt(result.own_memory), style=own_color),
+                Text(f"{percent_own:.2f}%", style=own_color),
+                Text(str(result.n_allocations), style=allocation_colors),
             )
 
         rprint(table, file=file)
@@ -10,8 +10,13 @@ from memray import AllocatorType
 from memray import MemorySnapshot
 from memray import Metadata
 from memray.reporters.common import format_thread_name
+from memray.reporters.frame_tools import StackFrame
 from memray.reporters.templates import render_report
 
+_ALLOCATOR_NAMES = {
+    int(allocator): allocator.name.lower() for allocator in AllocatorType
+}
+
 
 class TableReporter:
     def __init__(
@@ -34,25 +39,40 @@ class TableReporter:
         **kwargs: Any,
     ) -> "TableReporter":
         result = []
+        # Many records share the same allocating frame, so only format and
+        # escape each distinct frame once.
+        stack_by_frame: Dict[StackFrame, str] = {}
+        # The reader resolves a record's thread name from its tid alone.
+        thread_name_by_tid: Dict[int, str] = {}
         for record in allocations:
             stack_trace = (
-                list(record.hybrid_stack_trace(max_stacks=1))
+                record.hybrid_stack_trace(max_stacks=1)
                 if native_traces
                 else record.stack_trace(max_stacks=1)
             )
             stack = "???"
             if stack_trace:
-                function, file, line = stack_trace[0]
-                stack = f"{function} at {file}:{line}"
+                frame = stack_trace[0]
+                cached_stack = stack_by_frame.get(frame)
+                if cached_stack is None:
+                    function, file, line = frame
+                    cached_stack = html.escape(f"{function} at {file}:{line}")
+                    stack_by_frame[frame] = cached_stack
+                stack = cached_stack
+
+            tid = record.tid
+            thread_name = thread_name_by_tid.get(tid)
+            if thread_name is None:
+                thread_name = format_thread_name(record)
+                thread_name_by_tid[tid] = thread_name
 
-            allocator = AllocatorType(record.allocator)
             result.append(
                 {
-                    "tid": format_thread_name(record),
+                    "tid": thread_name,
                     "size": record.size,
-                    "allocator": allocator.name.lower(),
+                    "allocator": _ALLOCATOR_NAMES[record.allocator],
                     "n_allocations": record.n_allocations,
-                    "stack_trace": html.escape(stack),
+                    "stack_trace": stack,
                 }
             )
 
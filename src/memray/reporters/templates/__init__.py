@@ -15,8 +15,11 @@ from memray import Metadata
 @lru_cache(maxsize=1)
 def get_render_environment() -> jinja2.Environment:
     loader = jinja2.PackageLoader("memray.reporters")
-    env = jinja2.Environment(loader=loader)
+    # The templates ship with memray and never change while we're running,
+    # so there's no point in checking whether they're out of date on each use.
+    env = jinja2.Environment(loader=loader, auto_reload=False)
 
+    @lru_cache(maxsize=32)
     def include_file(name: str) -> Markup:
         """Include a file from the templates directory without
         interpolating its contents"""
@@ -28,6 +31,11 @@ def get_render_environment() -> jinja2.Environment:
     return env
 
 
+@lru_cache(maxsize=8)
+def get_report_template(kind: str) -> jinja2.Template:
+    return get_render_environment().get_template(kind + ".html")
+
+
 def get_report_title(
     *, kind: str, show_memory_leaks: bool, inverted: bool = False
 ) -> str:
@@ -51,8 +59,7 @@ def render_report(
     merge_threads: bool,
     inverted: bool,
 ) -> str:
-    env = get_render_environment()
-    template = env.get_template(kind + ".html")
+    template = get_report_template(kind)
 
     pretty_kind = kind.replace("_", " ")
     title = get_report_title(
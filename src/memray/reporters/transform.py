@@ -15,6 +15,8 @@ from memray.reporters.common import format_thread_name
 
 Location = Tuple[str, str]
 
+_ALLOCATOR_NAMES = {int(allocator): allocator.name for allocator in AllocatorType}
+
 
 class TransformReporter:
     SUFFIX_MAP = {
@@ -44,7 +46,14 @@ class TransformReporter:
     ) -> None:
         location_to_index: Dict[Location, int] = {}
         all_locations: List[Dict[str, str]] = []
-        events = []
+
+        # Stream the events out as we go instead of building a list with one
+        # entry per record and dumping everything at the end. The output is
+        # identical to what json.dump() would produce for the whole document.
+        outfile.write('{"version": 0, "costs": ')
+        json.dump([{"description": "Memory", "unit": "bytes"}], outfile)
+        outfile.write(', "events": [')
+        separator = ""
         for record in self.allocations:
             stack_trace = (
                 tuple(record.hybrid_stack_trace())
@@ -63,15 +72,13 @@ class TransformReporter:
 
             if not call_chain:
                 continue
-            events.append({"callchain": call_chain, "cost": [record.size]})
+            outfile.write(separator)
+            outfile.write(json.dumps({"callchain": call_chain, "cost": [record.size]}))
+            separator = ", "
 
-        result = {
-            "version": 0,
-            "costs": [{"description": "Memory", "unit": "bytes"}],
-            "events": events,
-            "functions": all_locations,
-        }
-        json.dump(result, outfile)
+        outfile.write('], "functions": ')
+        json.dump(all_locations, outfile)
+        outfile.write("}")
 
     def render(
         self,
@@ -114,7 +121,7 @@ class TransformReporter:
             )
             writer.writerow(
                 [
-                    AllocatorType(record.allocator).name,
+                    _ALLOCATOR_NAMES[record.allocator],
                     record.n_allocations,
                     record.size,
                     record.tid,
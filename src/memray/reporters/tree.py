@@ -1,15 +1,18 @@
 import asyncio
-import functools
+import heapq
 import linecache
 import sys
 from dataclasses import dataclass
 from dataclasses import field
+from itertools import islice
+from operator import methodcaller
 from typing import IO
 from typing import Any
 from typing import Callable
 from typing import Dict
 from typing import Iterable
 from typing import Iterator
+from typing import List
 from typing import Optional
 from typing import Tuple
 
@@ -52,8 +55,15 @@ StackElement = Tuple[str, str, int]
 
 ROOT_NODE = ("<ROOT>", "", 0)
 
+# There's one Frame per node in the tree, so avoid giving each of them its own
+# instance dictionary where the interpreter supports slotted dataclasses.
+if sys.version_info >= (3, 10):
+    _FRAME_DATACLASS_OPTIONS = {"slots": True}
+else:
+    _FRAME_DATACLASS_OPTIONS = {}
 
-@dataclass
+
+@dataclass(**_FRAME_DATACLASS_OPTIONS)
 class Frame:
     """A frame in the tree"""
 
@@ -89,16 +99,29 @@ class FrameDetailScreen(Widget):
         self.__is_mounted = False
 
     def on_mount(self) -> None:
+        # Keep references to the widgets updated for every highlighted frame,
+        # rather than searching the DOM for them each time.
+        self.__details = self.query_one("#details", Label)
+        self.__text_area = self.query_one("#textarea", TextArea)
         self.__is_mounted = True
 
     @work(exclusive=True)
-    async def update_text_area(self) -> None:
+    async def update_details(self) -> None:
+        # Moving the cursor quickly highlights many frames in a row. Wait a
+        # moment so that only the last of them gets its details rendered.
         await asyncio.sleep(0.1)
 
         if not self.__is_mounted or self.frame is None:
             return
 
-        text = self.query_one("#textarea", TextArea)
+        self.update_labels()
+        self.update_text_area()
+
+    def update_labels(self) -> None:
+        self.__details.update(self._get_details())
+
+    def update_text_area(self) -> None:
+        text = self.__text_area
 
         if self.frame.location is None or self.frame.location == ROOT_NODE:
             text.clear()
@@ -155,18 +178,22 @@ class FrameDetailScreen(Widget):
             "thread": f":thread: Thread: {self.frame.thread_id}",
         }
 
+    def _get_details(self) -> str:
+        # All of the details go into a single label, so that highlighting a
+        # frame only updates one widget. Separating them with two blank lines
+        # keeps the layout they had as separately padded labels.
+        content_by_label_id = self._get_content_by_label_id()
+        return "\n\n\n".join(
+            content_by_label_id[label_id]
+            for label_id in ("function", "location", "allocs", "size", "thread")
+            if content_by_label_id[label_id]
+        )
+
     def watch_frame(self) -> None:
         if not self.__is_mounted or self.frame is None:
             return
 
-        self.update_text_area()
-
-        content_by_label_id = self._get_content_by_label_id()
-        for label_id, content in content_by_label_id.items():
-            label = self.query_one(f"#{label_id}", Label)
-            label.update(content)
-            label.set_class(not content, "hidden")
-            label.styles.display = "block" if content else "none"
+        self.update_details()
 
     def compose(self) -> ComposeResult:
         if self.frame is None:
@@ -191,15 +218,7 @@ class FrameDetailScreen(Widget):
         text.cursor_blink = False
         text.soft_wrap = False
 
-        labels: list[Label] = []
-        content_by_label_id = self._get_content_by_label_id()
-        for label_id in ("function", "location", "allocs", "size", "thread"):
-            content = content_by_label_id[label_id]
-            label = Label(content, id=label_id)
-            label.styles.display = "block" if content else "none"
-            labels.append(label)
-
-        node_metadata = Vertical(*labels)
+        node_metadata = Vertical(Label(self._get_details(), id="details"))
         yield Grid(
             text,
             node_metadata,
@@ -208,13 +227,21 @@ class FrameDetailScreen(Widget):
 
 
 class FrameTree(Tree[Frame]):
+    # Looked up on first use, rather than searching the DOM on every event
+    _detail_screen: Optional[FrameDetailScreen] = None
+
+    def show_frame_details(self, frame: Frame) -> None:
+        if self._detail_screen is None:
+            self._detail_screen = self.app.query_one(FrameDetailScreen)
+        self._detail_screen.frame = frame
+
     def on_tree_node_selected(self, node: Tree.NodeSelected[Frame]) -> None:
         if node.node.data is not None:
-            self.app.query_one(FrameDetailScreen).frame = node.node.data
+            self.show_frame_details(node.node.data)
 
     def on_tree_node_highlighted(self, node: Tree.NodeHighlighted[Frame]) -> None:
         if node.node.data is not None:
-            self.app.query_one(FrameDetailScreen).frame = node.node.data
+            self.show_frame_details(node.node.data)
 
 
 def node_is_interesting(node: Frame) -> bool:
@@ -254,6 +281,9 @@ class TreeScreen(Screen[None]):
         self.uninteresting_filter: Optional[
             Callable[[Frame], bool]
         ] = node_is_interesting
+        # Labels only depend on the frame and on the root's total size, so they
+        # can be reused whenever a filter toggle rebuilds the tree.
+        self._frame_text_cache: Dict[Tuple[int, bool], Text] = {}
 
     def expand_first_child(self, node: TreeNode[Frame]) -> None:
         while node.children:
@@ -262,6 +292,7 @@ class TreeScreen(Screen[None]):
 
     def compose(self) -> ComposeResult:
         tree = FrameTree(self.frame_text(self.data, allow_expand=True), self.data)
+        self.frame_tree = tree
         self.repopulate_tree(tree)
         yield Horizontal(
             Vertical(tree),
@@ -283,8 +314,7 @@ class TreeScreen(Screen[None]):
         self.expand_first_child(tree.root)
 
     def action_expand_linear_group(self) -> None:
-        tree = self.query_one(FrameTree)
-        current_node = tree.cursor_node
+        current_node = self.frame_tree.cursor_node
         while current_node:
             current_node.toggle()
             if len(current_node.children) != 1:
@@ -292,39 +322,47 @@ class TreeScreen(Screen[None]):
             current_node = current_node.children[0]
 
     def frame_text(self, node: Frame, *, allow_expand: bool) -> Text:
+        cache_key = (id(node), allow_expand)
+        text = self._frame_text_cache.get(cache_key)
+        if text is None:
+            text = self._make_frame_text(node, allow_expand=allow_expand)
+            self._frame_text_cache[cache_key] = text
+        return text
+
+    def _make_frame_text(self, node: Frame, *, allow_expand: bool) -> Text:
         if node.value == 0:
             return Text("<No allocations>")
 
         value = node.value
         root_data = self.data
         size_str = f"{size_fmt(value)} ({100 * value / root_data.value:.2f} %)"
-        size_color = _info_color(node, root_data)
+        size = (f" {size_str} ", _info_style(node, root_data))
+        icon = "\N{OPEN FILE FOLDER}" if allow_expand else "\N{PAGE FACING UP}"
 
-        ret = Text.from_markup(
-            ":open_file_folder:" if allow_expand else ":page_facing_up:"
-        )
-        ret.append_text(Text(f" {size_str} ", style=Style(color=size_color.rich_color)))
+        if node.location is None:
+            return Text.assemble(icon, size, "hidden")
 
-        if node.location is not None:
-            function, file, lineno = node.location
-            code_position = (
-                f"{_filename_to_module_name(file)}:{lineno}" if lineno != 0 else file
-            )
-            ret.append_text(Text.from_markup(f"[bold]{function}[/]"))
-            if code_position:
-                ret.append_text(Text.from_markup(f"  [dim cyan]{code_position}[/]"))
-        else:
-            ret.append_text(Text("hidden"))
-        return ret
+        function, file, lineno = node.location
+        code_position = (
+            f"{_filename_to_module_name(file)}:{lineno}" if lineno != 0 else file
+        )
+        if not code_position:
+            return Text.assemble(icon, size, (function, "bold"))
+        return Text.assemble(
+            icon, size, (function, "bold"), "  ", (code_position, "dim cyan")
+        )
 
     def add_children(self, tree: TreeNode[Frame], children: Iterable[Frame]) -> None:
-        # Add children to the tree from largest to smallest
-        children = sorted(children, key=lambda child: child.value, reverse=True)
+        # Walk the frames depth first using an explicit stack rather than
+        # recursion, as trees can get nearly as deep as the recursion limit.
+        stack = [(tree, self.children_to_add(children))]
+        while stack:
+            tree, pending_children = stack[-1]
+            child = next(pending_children, None)
+            if child is None:
+                stack.pop()
+                continue
 
-        if self.import_system_filter is not None:
-            children = tuple(filter(self.import_system_filter, children))
-
-        for child in children:
             if self.uninteresting_filter is None or self.uninteresting_filter(child):
                 if not tree.allow_expand:
                     assert tree.data is not None
@@ -338,7 +376,13 @@ class TreeScreen(Screen[None]):
             else:
                 new_tree = tree
 
-            self.add_children(new_tree, child.children.values())
+            stack.append((new_tree, self.children_to_add(child.children.values())))
+
+    def children_to_add(self, children: Iterable[Frame]) -> Iterator[Frame]:
+        # Children are already ordered from largest to smallest
+        if self.import_system_filter is not None:
+            return filter(self.import_system_filter, children)
+        return iter(children)
 
     def add_elided_locations_node(self, tree: TreeNode[Frame]) -> None:
         if not self.elided_locations.n_locations:
@@ -351,14 +395,11 @@ class TreeScreen(Screen[None]):
         root_data = self.data
         percentage = 100 * value / root_data.value
         size_str = f"{size_fmt(value)} ({percentage:.2f} %)"
-        size_color = _percentage_to_color(int(percentage))
-        ret = Text.from_markup("\N{black question mark ornament}")
-        ret.append_text(Text(f" {size_str} ", style=Style(color=size_color.rich_color)))
-        ret.append_text(
-            Text.from_markup(
-                f"{number} allocations from {count} locations"
-                f" below the configured threshold"
-            )
+        ret = Text.assemble(
+            "\N{black question mark ornament}",
+            (f" {size_str} ", _PERCENTAGE_STYLES[int(percentage)]),
+            f"{number} allocations from {count} locations"
+            " below the configured threshold",
         )
 
         tree.add_leaf(ret, data=Frame(location=None, value=value, n_allocations=number))
@@ -370,7 +411,7 @@ class TreeScreen(Screen[None]):
             self.import_system_filter = None
 
         redraw_footer(self.app)
-        self.repopulate_tree(self.query_one(FrameTree))
+        self.repopulate_tree(self.frame_tree)
 
     def action_toggle_uninteresting(self) -> None:
         if self.uninteresting_filter is None:
@@ -379,7 +420,7 @@ class TreeScreen(Screen[None]):
             self.uninteresting_filter = None
 
         redraw_footer(self.app)
-        self.repopulate_tree(self.query_one(FrameTree))
+        self.repopulate_tree(self.frame_tree)
 
     def rewrite_bindings(self, bindings: Bindings) -> None:
         if self.import_system_filter is not None:
@@ -415,20 +456,54 @@ class TreeApp(App[None]):
             return bindings  # type: ignore[no-any-return]
 
 
-@functools.lru_cache(maxsize=None)
-def _percentage_to_color(percentage: int) -> Color:
-    gradient = Gradient(
-        (0, Color(97, 193, 44)),
-        (0.4, Color(236, 152, 16)),
-        (0.6, Color.parse("darkorange")),
-        (1, Color.parse("indianred")),
-    )
-    return gradient.get_color(percentage / 100)
+_SIZE_GRADIENT = Gradient(
+    (0, Color(97, 193, 44)),
+    (0.4, Color(236, 152, 16)),
+    (0.6, Color.parse("darkorange")),
+    (1, Color.parse("indianred")),
+)
+
+# Sizes are colored by the whole percentage of the total that they account
+# for, so there are only 101 possible styles. Build all of them up front.
+_PERCENTAGE_STYLES = tuple(
+    Style(color=_SIZE_GRADIENT.get_color(percentage / 100).rich_color)
+    for percentage in range(101)
+)
+
+
+def _sort_children_by_size(root: Frame) -> None:
+    """Reorder the children of every frame from largest to smallest.
+
+    Doing this once up front means the tree can be populated in order
+    without sorting again every time a filter is toggled.
+    """
+    pending = [root]
+    while pending:
+        frame = pending.pop()
+        if len(frame.children) > 1:
+            frame.children = dict(
+                sorted(
+                    frame.children.items(),
+                    key=lambda item: item[1].value,
+                    reverse=True,
+                )
+            )
+        pending.extend(frame.children.values())
+
+
+def _classify_frame(frame: StackElement) -> Tuple[bool, bool, bool]:
+    """Return whether a frame is CPython internal, from the import system, and
+    interesting."""
+    if is_cpython_internal(frame):
+        return True, False, False
+    is_import_system = is_frame_from_import_system(frame)
+    is_interesting = not is_import_system and is_frame_interesting(frame)
+    return False, is_import_system, is_interesting
 
 
-def _info_color(node: Frame, root_node: Frame) -> Color:
+def _info_style(node: Frame, root_node: Frame) -> Style:
     proportion_of_total = node.value / root_node.value
-    return _percentage_to_color(int(proportion_of_total * 100))
+    return _PERCENTAGE_STYLES[int(proportion_of_total * 100)]
 
 
 class TreeReporter:
@@ -445,27 +520,59 @@ class TreeReporter:
         biggest_allocs: int = 200,
         native_traces: bool,
     ) -> "TreeReporter":
-        data = Frame(location=ROOT_NODE, value=0, import_system=False, interesting=True)
-        sorted_records = sorted(allocations, key=lambda alloc: alloc.size, reverse=True)
-        for record in sorted_records[:biggest_allocs]:
+        elided_locations = ElidedLocations()
+        elided_locations.cutoff = biggest_allocs
+
+        # Only the biggest records are added to the tree, so keep them in a
+        # bounded min-heap rather than sorting all of them. Every record is
+        # first counted as elided, and the ones that make it into the tree are
+        # taken back out of those totals. Ties keep the earliest record, like a
+        # stable sort would.
+        biggest: List[Tuple[int, int, AllocationRecord]] = []
+        for index, record in enumerate(allocations):
             size = record.size
-            data.value += size
-            data.n_allocations += record.n_allocations
+            elided_locations.n_locations += 1
+            elided_locations.n_bytes += size
+            elided_locations.n_allocations += record.n_allocations
+            if len(biggest) < biggest_allocs:
+                heapq.heappush(biggest, (size, -index, record))
+            elif biggest and size > biggest[0][0]:
+                heapq.heapreplace(biggest, (size, -index, record))
+        biggest_records = [record for _, _, record in sorted(biggest, reverse=True)]
+
+        data = Frame(
+            location=ROOT_NODE,
+            value=elided_locations.n_bytes,
+            n_allocations=elided_locations.n_allocations,
+            import_system=False,
+            interesting=True,
+        )
+        # The same frames show up in the stacks of many allocations, so only
+        # classify each of them once per report.
+        classification_by_frame: Dict[StackElement, Tuple[bool, bool, bool]] = {}
+        get_stack = methodcaller(
+            "hybrid_stack_trace" if native_traces else "stack_trace"
+        )
+        for record in biggest_records:
+            size = record.size
+            n_allocations = record.n_allocations
+            thread_id = format_thread_name(record)
+            elided_locations.n_locations -= 1
+            elided_locations.n_bytes -= size
+            elided_locations.n_allocations -= n_allocations
 
             current_frame = data
-            stack = (
-                tuple(record.hybrid_stack_trace())
-                if native_traces
-                else record.stack_trace()
-            )
-            for index, stack_frame in enumerate(reversed(stack)):
-                if is_cpython_internal(stack_frame):
+            stack = get_stack(record)
+            for stack_frame in islice(reversed(stack), MAX_STACKS + 2):
+                classification = classification_by_frame.get(stack_frame)
+                if classification is None:
+                    classification = _classify_frame(stack_frame)
+                    classification_by_frame[stack_frame] = classification
+                is_internal, is_import_system, is_interesting = classification
+                if is_internal:
                     continue
-                is_import_system = is_frame_from_import_system(stack_frame)
-                is_interesting = not is_import_system and is_frame_interesting(
-                    stack_frame
-                )
-                if stack_frame not in current_frame.children:
+                node = current_frame.children.get(stack_frame)
+                if node is None:
                     node = Frame(
                         value=0,
                         location=stack_frame,
@@ -474,24 +581,12 @@ class TreeReporter:
                     )
                     current_frame.children[stack_frame] = node
 
-                current_frame = current_frame.children[stack_frame]
+                current_frame = node
                 current_frame.value += size
-                current_frame.n_allocations += record.n_allocations
-                current_frame.thread_id = format_thread_name(record)
-
-                if index > MAX_STACKS:
-                    break
-
-        elided_locations = ElidedLocations()
-        elided_locations.cutoff = biggest_allocs
-
-        for record in sorted_records[biggest_allocs:]:
-            data.value += record.size
-            data.n_allocations += record.n_allocations
-            elided_locations.n_locations += 1
-            elided_locations.n_bytes += record.size
-            elided_locations.n_allocations += record.n_allocations
+                current_frame.n_allocations += n_allocations
+                current_frame.thread_id = thread_id
 
+        _sort_children_by_size(data)
         return cls(data, elided_locations)
 
     def get_app(self) -> TreeApp:
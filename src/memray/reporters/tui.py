@@ -3,17 +3,19 @@ import os
 import pathlib
 import sys
 import threading
-from collections import defaultdict
 from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from functools import total_ordering
 from math import ceil
+from operator import attrgetter
 from typing import Any
-from typing import DefaultDict
+from typing import Deque
 from typing import Dict
 from typing import Iterable
 from typing import List
+from typing import NamedTuple
 from typing import Optional
 from typing import Set
 from typing import Tuple
@@ -54,12 +56,15 @@ from memray.reporters._textual_hacks import update_key_description
 MAX_MEMORY_RATIO = 0.95
 
 
-@dataclass(frozen=True)
-class Location:
+class Location(NamedTuple):
     function: str
     file: str
 
 
+# Allocations without a stack are attributed to this placeholder frame
+_UNKNOWN_STACK = (("???", "???", 0),)
+
+
 @dataclass
 class AllocationEntry:
     own_memory: int
@@ -102,6 +107,9 @@ class MemoryGraph(Widget):
         self._maxval = maxval
         values = [minval] * (2 * self._width + 1)
         self._values = deque(values, maxlen=2 * self._width)
+        self._blocks: Optional[Deque[List[int]]] = None
+        self._graph: Optional[List[str]] = None
+        self._graph_width = 0
 
         self._lookup = [
             [" ", "▗", "▐"],
@@ -133,7 +141,12 @@ class MemoryGraph(Widget):
     def add_value(self, value: float) -> None:
         if value > self._maxval:
             self._maxval = value
+            # Every sample's height is relative to the maximum
+            self._blocks = None
         self._values.append(value)
+        if self._blocks is not None:
+            self._blocks.append(self._value_to_blocks(value))
+        self._graph = None
         if self._maxval > 1:
             self.border_subtitle = (
                 f"{size_fmt(int(value))}"
@@ -142,22 +155,34 @@ class MemoryGraph(Widget):
             )
         self.refresh()
 
-    def render_line(self, y: int) -> Strip:
-        graph: list[list[str]] = [[] for _ in range(self._height)]
-        blocks_by_index = [self._value_to_blocks(value) for value in self._values]
+    def _render_graph(self) -> List[str]:
+        graph: List[List[str]] = [[] for _ in range(self._height)]
+        if self._blocks is None:
+            self._blocks = deque(
+                map(self._value_to_blocks, self._values), maxlen=2 * self._width
+            )
+        blocks_by_index = list(self._blocks)
 
         for left, right in zip(blocks_by_index[::2], blocks_by_index[1::2]):
             for row, char in enumerate(
                 reversed(tuple(self._lookup[li][ri] for li, ri in zip(left, right)))
             ):
                 graph[row].append(char)
+        return ["".join(row) for row in graph]
+
+    def render_line(self, y: int) -> Strip:
+        # Every line of the graph is drawn from the same values, so draw the
+        # whole graph once, fitted to the widget's width, and reuse it until
+        # another value is added or the widget is resized.
+        width = self.size.width
+        if self._graph is None or self._graph_width != width:
+            self._graph = [row[-width:].rjust(width) for row in self._render_graph()]
+            self._graph_width = width
+        graph = self._graph
 
         if y > len(graph):
-            return Strip.blank(self.size.width)
-        data = " " * self.size.width
-        data += "".join(graph[y])
-        data = data[-self.size.width :]
-        return Strip([Segment(data, self.rich_style)])
+            return Strip.blank(width)
+        return Strip([Segment(graph[y], self.rich_style)])
 
 
 @total_ordering
@@ -168,13 +193,13 @@ class SortableText(Text):
         self,
         value: Any,
         text: str,
-        color: Color,
+        style: Style,
         justify: Any = "right",  # "Any" is a hack: justify should be Literal
     ) -> None:
         self.value = value
         super().__init__(
             str(text),
-            Style(color=color.rich_color),
+            style,
             justify=justify,
         )
 
@@ -203,55 +228,64 @@ def aggregate_allocations(
     allocations which happened on the frame, and sum up allocations on
     all of the child frames to calculate "total" allocations."""
 
-    processed_allocations: DefaultDict[Location, AllocationEntry] = defaultdict(
-        lambda: AllocationEntry(
-            own_memory=0, total_memory=0, n_allocations=0, thread_ids=set()
-        )
-    )
+    processed_allocations: Dict[Location, AllocationEntry] = {}
 
     current_total = 0
+    visited: Set[Location] = set()
     for allocation in allocations:
         if current_total >= memory_threshold:
             break
-        current_total += allocation.size
+        # Read each of the record's fields once rather than once per frame
+        size = allocation.size
+        n_allocations = allocation.n_allocations
+        tid = allocation.tid
+        current_total += size
 
-        stack_trace = list(
+        stack_trace = (
             allocation.hybrid_stack_trace()
             if native_traces
             else allocation.stack_trace()
-        )
-        if not stack_trace:
-            frame = processed_allocations[Location(function="???", file="???")]
-            frame.total_memory += allocation.size
-            frame.own_memory += allocation.size
-            frame.n_allocations += allocation.n_allocations
-            frame.thread_ids.add(allocation.tid)
-            continue
+        ) or _UNKNOWN_STACK
 
         # Walk upwards and sum totals
-        visited = set()
+        visited.clear()
         for i, (function, file_name, _) in enumerate(stack_trace):
             location = Location(function=function, file=file_name)
-            frame = processed_allocations[location]
             if location in visited:
                 continue
+            frame = processed_allocations.get(location)
+            if frame is None:
+                frame = processed_allocations[location] = AllocationEntry(
+                    own_memory=0, total_memory=0, n_allocations=0, thread_ids=set()
+                )
             visited.add(location)
             if i == 0:
-                frame.own_memory += allocation.size
-            frame.total_memory += allocation.size
-            frame.n_allocations += allocation.n_allocations
-            frame.thread_ids.add(allocation.tid)
+                frame.own_memory += size
+            frame.total_memory += size
+            frame.n_allocations += n_allocations
+            frame.thread_ids.add(tid)
     return processed_allocations
 
 
 class TimeDisplay(Static):
     """TUI widget to display the current time."""
 
+    _displayed_time = ""
+
     def on_mount(self) -> None:
         """Event handler called when the widget is added to the app."""
-        self.set_interval(0.1, lambda: self.update(datetime.now().ctime()))
+        self.set_interval(0.1, self._update_time)
+
+    def _update_time(self) -> None:
+        # Poll often enough to stay in step with the wall clock, but only
+        # re-render when the displayed second actually changes.
+        now = datetime.now().ctime()
+        if now != self._displayed_time:
+            self._displayed_time = now
+            self.update(now)
 
 
+@lru_cache(maxsize=4096)
 def _filename_to_module_name(file: str) -> str:
     if file.endswith(".py"):
         for path in sys.path:
@@ -265,6 +299,11 @@ def _filename_to_module_name(file: str) -> str:
     return file
 
 
+# What an allocation table row shows: its raw values, which its cells are
+# sorted by, and the percentages and styles they are drawn with.
+_RowValues = Tuple[int, int, int, str, str, Style, Style, Style]
+
+
 class AllocationTable(Widget):
     """Widget to display the TUI table."""
 
@@ -319,6 +358,7 @@ class AllocationTable(Widget):
     def __init__(self) -> None:
         super().__init__()
         self._composed = False
+        self._values_by_row_key: Dict[RowKey, _RowValues] = {}
 
         gradient = Gradient(
             (0, Color(97, 193, 44)),
@@ -326,10 +366,12 @@ class AllocationTable(Widget):
             (0.6, Color.parse("darkorange")),
             (1, Color.parse("indianred")),
         )
-        self._color_by_percentage = {i: gradient.get_color(i / 100) for i in range(101)}
+        self._style_by_percentage = tuple(
+            Style(color=gradient.get_color(i / 100).rich_color) for i in range(101)
+        )
 
-    def _get_color(self, value: float, max: float) -> Color:
-        return self._color_by_percentage[int(value * 100 / max)]
+    def _get_style(self, value: float, max: float) -> Style:
+        return self._style_by_percentage[int(value * 100 / max)]
 
     def get_heading(self, column_idx: int) -> Text:
         sort_column = (
@@ -399,13 +441,12 @@ class AllocationTable(Widget):
         allocation_entries = self.snapshot.records_by_location
         total_allocations = self.snapshot.heap_size
         num_allocations = sum(
-            entry.n_allocations for entry in allocation_entries.values()
+            map(attrgetter("n_allocations"), allocation_entries.values())
         )
+        get_sort_value = attrgetter(self.KEY_TO_COLUMN_NAME[self.sort_column_id])
         sorted_allocations = sorted(
             allocation_entries.items(),
-            key=lambda item: getattr(
-                item[1], self.KEY_TO_COLUMN_NAME[self.sort_column_id]
-            ),
+            key=lambda item: get_sort_value(item[1]),
             reverse=True,
         )
 
@@ -417,34 +458,56 @@ class AllocationTable(Widget):
         old_locations = set(table.rows)
         new_locations = set()
 
+        merge_threads = self.merge_threads
+        current_thread = self.current_thread
+        get_style = self._get_style
         for location, result in sorted_allocations:
-            if not self.merge_threads and (
-                self.current_thread not in result.thread_ids
-            ):
+            if not merge_threads and current_thread not in result.thread_ids:
                 continue
 
-            total_color = self._get_color(result.total_memory, total_allocations)
-            own_color = self._get_color(result.own_memory, total_allocations)
-            allocation_color = self._get_color(result.n_allocations, num_allocations)
+            row_key = str((location.function, location.file))
+            table_key = RowKey(row_key)
+            new_locations.add(table_key)
+
+            total_style = get_style(result.total_memory, total_allocations)
+            own_style = get_style(result.own_memory, total_allocations)
+            allocation_style = get_style(result.n_allocations, num_allocations)
 
             percent_total = result.total_memory / total_allocations * 100
             percent_own = result.own_memory / total_allocations * 100
+            percent_total_str = f"{percent_total:.2f}%"
+            percent_own_str = f"{percent_own:.2f}%"
+
+            # Most rows are drawn the same way from one snapshot to the next,
+            # even though the heap totals that their percentages and colors
+            # are relative to keep changing. Compare what the row's cells
+            # show, and skip rebuilding them when nothing visible changed.
+            row_values = (
+                result.total_memory,
+                result.own_memory,
+                result.n_allocations,
+                percent_total_str,
+                percent_own_str,
+                total_style,
+                own_style,
+                allocation_style,
+            )
+            if self._values_by_row_key.get(table_key) == row_values:
+                continue
+            self._values_by_row_key[table_key] = row_values
 
             cells = [
                 SortableText(
-                    result.total_memory, size_fmt(result.total_memory), total_color
+                    result.total_memory, size_fmt(result.total_memory), total_style
                 ),
-                SortableText(result.total_memory, f"{percent_total:.2f}%", total_color),
-                SortableText(result.own_memory, size_fmt(result.own_memory), own_color),
-                SortableText(result.own_memory, f"{percent_own:.2f}%", own_color),
+                SortableText(result.total_memory, percent_total_str, total_style),
+                SortableText(result.own_memory, size_fmt(result.own_memory), own_style),
+                SortableText(result.own_memory, percent_own_str, own_style),
                 SortableText(
-                    result.n_allocations, str(result.n_allocations), allocation_color
+                    result.n_allocations, str(result.n_allocations), allocation_style
                 ),
             ]
 
-            row_key = str((location.function, location.file))
-            new_locations.add(RowKey(row_key))
-
             if row_key not in table.rows:
                 table.add_row(
                     Text(location.function, style=function_column_style),
@@ -459,6 +522,7 @@ class AllocationTable(Widget):
 
         for old_row_key in old_locations - new_locations:
             table.remove_row(old_row_key)
+            del self._values_by_row_key[old_row_key]
 
         table.sort(str(self.sort_column_id), reverse=True)
 
@@ -721,7 +785,7 @@ class UpdateThread(threading.Thread):
             self._update_requested.clear()
 
             records = list(self._reader.get_current_snapshot(merge_threads=False))
-            heap_size = sum(record.size for record in records)
+            heap_size = sum(map(attrgetter("size"), records))
             records_by_location = aggregate_allocations(
                 records, MAX_MEMORY_RATIO * heap_size, self._reader.has_native_traces
             )
@@ -1748,3 +1748,97 @@ class TestMemorySnapshots:
         assert record.n_allocations == 1
         assert record.allocator == AllocatorType.MALLOC
         assert record.size == 2 << 10
+
+
+class TestComputeStatistics:
+    @staticmethod
+    def _track_allocations(output):
+        allocator = MemoryAllocator()
+
+        def allocate_often():
+            allocator.valloc(1024 * 1024)
+            allocator.free()
+
+        def allocate_twice():
+            allocator.valloc(2 * 1024 * 1024)
+            allocator.free()
+
+        def allocate_once():
+            allocator.valloc(3 * 1024 * 1024)
+            allocator.free()
+
+        with Tracker(output):
+            for _ in range(3):
+                allocate_often()
+            for _ in range(2):
+                allocate_twice()
+            allocate_once()
+
+    def test_no_top_locations_requested(self, tmp_path):
+        # GIVEN
+        output = tmp_path / "test.bin"
+        self._track_allocations(output)
+
+        # WHEN
+        stats = compute_statistics(str(output), num_largest=0)
+
+        # THEN
+        assert stats.top_locations_by_size == []
+        assert stats.top_locations_by_count == []
+
+    def test_top_locations_by_size_are_largest_first(self, tmp_path):
+        # GIVEN
+        output = tmp_path / "test.bin"
+        self._track_allocations(output)
+
+        # WHEN
+        stats = compute_statistics(str(output), num_largest=3)
+
+        # THEN
+        functions_and_sizes = [
+            (location[0], size) for location, size in stats.top_locations_by_size
+        ]
+        assert functions_and_sizes[0] == ("allocate_twice", 4 * 1024 * 1024)
+        # allocate_often and allocate_once allocate the same number of bytes
+        assert sorted(functions_and_sizes[1:]) == [
+            ("allocate_often", 3 * 1024 * 1024),
+            ("allocate_once", 3 * 1024 * 1024),
+        ]
+
+    def test_more_top_locations_than_exist(self, tmp_path):
+        # GIVEN
+        output = tmp_path / "test.bin"
+        self._track_allocations(output)
+
+        # WHEN
+        stats = compute_statistics(str(output), num_largest=100000)
+
+        # THEN
+        for top_locations in (
+            stats.top_locations_by_size,
+            stats.top_locations_by_count,
+        ):
+            values = [value for _, value in top_locations]
+            assert 3 <= len(values) < 100000
+            assert values == sorted(values, reverse=True)
+
+    def test_top_locations_are_prefixes_of_each_other(self, tmp_path):
+        # GIVEN
+        output = tmp_path / "test.bin"
+        self._track_allocations(output)
+        stats = compute_statistics(str(output), num_largest=100000)
+
+        for num_largest in range(1, 6):
+            # WHEN
+            top_stats = compute_statistics(str(output), num_largest=num_largest)
+
+            # THEN
+            # Ties must be broken the same way no matter how many are requested
+            assert (
+                top_stats.top_locations_by_size
+                == stats.top_locations_by_size[:num_largest]
+            )
+            assert (
+                top_stats.top_locations_by_count
+                == stats.top_locations_by_count[:num_largest]
+            )
@@ -1,7 +1,10 @@
 from io import StringIO
 
+import pytest
+
 from memray import AllocatorType
 from memray.reporters.summary import SummaryReporter
+from memray.reporters.summary import _size_to_color
 from tests.utils import MockAllocationRecord
 
 
@@ -211,3 +214,21 @@ def test_non_sequence_iterable():
     ]
     actual = [line.rstrip() for line in output.getvalue().splitlines()]
     assert actual == expected
+
+
+@pytest.mark.parametrize(
+    "proportion_of_total, color",
+    [
+        (0.0, "bright_green"),
+        (0.05, "bright_green"),
+        (0.050001, "green"),
+        (0.2, "green"),
+        (0.200001, "yellow"),
+        (0.6, "yellow"),
+        (0.600001, "red"),
+        (1.0, "red"),
+    ],
+)
+def test_size_color_thresholds(proportion_of_total, color):
+    # A proportion exactly at a threshold keeps the color below it
+    assert _size_to_color(proportion_of_total) == color
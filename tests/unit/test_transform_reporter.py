@@ -180,6 +180,87 @@ class TestGprof2DotTransformReporter:
             "version": 0,
         }
 
+    def test_output_matches_a_single_json_dump(self):
+        # GIVEN
+        peak_allocations = [
+            MockAllocationRecord(
+                tid=1,
+                address=0x1000000,
+                size=1024,
+                allocator=AllocatorType.MALLOC,
+                stack_id=1,
+                n_allocations=1,
+                _stack=[
+                    ("me", "foo.py", 12),
+                    ("parent", "foo.py", 8),
+                ],
+            ),
+            MockAllocationRecord(
+                tid=1,
+                address=0x1100000,
+                size=2048,
+                allocator=AllocatorType.VALLOC,
+                stack_id=2,
+                n_allocations=10,
+                _stack=[],
+            ),
+            MockAllocationRecord(
+                tid=2,
+                address=0x1200000,
+                size=4096,
+                allocator=AllocatorType.MALLOC,
+                stack_id=3,
+                n_allocations=1,
+                _stack=[
+                    ("you", 'b\u00e4r "quoted".py', 21),
+                    ("parent", "foo.py", 8),
+                ],
+            ),
+        ]
+        output = StringIO()
+
+        reporter = TransformReporter(
+            peak_allocations, format="gprof2dot", memory_records=[], native_traces=False
+        )
+
+        # WHEN
+        reporter.render_as_gprof2dot(output)
+
+        # THEN
+        expected = {
+            "version": 0,
+            "costs": [{"description": "Memory", "unit": "bytes"}],
+            "events": [
+                {"callchain": [0, 1], "cost": [1024]},
+                {"callchain": [2, 1], "cost": [4096]},
+            ],
+            "functions": [
+                {"name": "me", "module": "foo.py"},
+                {"name": "parent", "module": "foo.py"},
+                {"name": "you", "module": 'b\u00e4r "quoted".py'},
+            ],
+        }
+        assert output.getvalue() == json.dumps(expected)
+
+    def test_empty_output_matches_a_single_json_dump(self):
+        # GIVEN
+        reporter = TransformReporter(
+            [], format="gprof2dot", memory_records=[], native_traces=False
+        )
+        output = StringIO()
+
+        # WHEN
+        reporter.render_as_gprof2dot(output)
+
+        # THEN
+        expected = {
+            "version": 0,
+            "costs": [{"description": "Memory", "unit": "bytes"}],
+            "events": [],
+            "functions": [],
+        }
+        assert output.getvalue() == json.dumps(expected)
+
 
 class TestCSVTransformReporter:
     HEADER = [
@@ -778,6 +778,144 @@ class TestTreeReporter:
             import_system=False,
         )
 
+    def test_zero_biggest_allocs_elides_every_record(self):
+        # GIVEN
+        peak_allocations = [
+            MockAllocationRecord(
+                tid=1,
+                address=0x1000000,
+                size=size,
+                allocator=AllocatorType.MALLOC,
+                stack_id=1,
+                n_allocations=n_allocations,
+                _stack=[(function, "fun.py", 12)],
+            )
+            for function, size, n_allocations in [
+                ("a", 10, 1),
+                ("b", 20, 2),
+                ("c", 30, 3),
+            ]
+        ]
+
+        # WHEN
+        reporter = TreeReporter.from_snapshot(
+            peak_allocations, native_traces=False, biggest_allocs=0
+        )
+
+        # THEN
+        assert reporter.data == Frame(
+            location=("<ROOT>", "", 0),
+            value=60,
+            children={},
+            n_allocations=6,
+            thread_id="",
+            interesting=True,
+            import_system=False,
+        )
+        assert reporter.elided_locations.cutoff == 0
+        assert reporter.elided_locations.n_locations == 3
+        assert reporter.elided_locations.n_bytes == 60
+        assert reporter.elided_locations.n_allocations == 6
+
+    def test_biggest_allocs_larger_than_number_of_records(self):
+        # GIVEN
+        peak_allocations = [
+            MockAllocationRecord(
+                tid=1,
+                address=0x1000000,
+                size=size,
+                allocator=AllocatorType.MALLOC,
+                stack_id=1,
+                n_allocations=n_allocations,
+                _stack=[(function, "fun.py", 12)],
+            )
+            for function, size, n_allocations in [
+                ("a", 10, 1),
+                ("b", 30, 3),
+                ("c", 20, 2),
+            ]
+        ]
+
+        # WHEN
+        reporter = TreeReporter.from_snapshot(
+            peak_allocations, native_traces=False, biggest_allocs=10
+        )
+
+        # THEN
+        assert reporter.data.value == 60
+        assert reporter.data.n_allocations == 6
+        assert [
+            (child.location[0], child.value, child.n_allocations)
+            for child in reporter.data.children.values()
+        ] == [("b", 30, 3), ("c", 20, 2), ("a", 10, 1)]
+        assert reporter.elided_locations.cutoff == 10
+        assert reporter.elided_locations.n_locations == 0
+        assert reporter.elided_locations.n_bytes == 0
+        assert reporter.elided_locations.n_allocations == 0
+
+    def test_biggest_allocs_keeps_earliest_of_equal_sized_records(self):
+        # GIVEN
+        peak_allocations = [
+            MockAllocationRecord(
+                tid=1,
+                address=0x1000000,
+                size=size,
+                allocator=AllocatorType.MALLOC,
+                stack_id=1,
+                n_allocations=1,
+                _stack=[(function, "fun.py", 12)],
+            )
+            for function, size in [("a", 10), ("b", 20), ("c", 20), ("d", 20)]
+        ]
+
+        # WHEN
+        reporter = TreeReporter.from_snapshot(
+            peak_allocations, native_traces=False, biggest_allocs=2
+        )
+
+        # THEN
+        assert [child.location[0] for child in reporter.data.children.values()] == [
+            "b",
+            "c",
+        ]
+        assert reporter.data.value == 70
+        assert reporter.elided_locations.n_locations == 2
+        assert reporter.elided_locations.n_bytes == 30
+
+    def test_children_are_sorted_by_size(self):
+        # GIVEN
+        peak_allocations = [
+            MockAllocationRecord(
+                tid=1,
+                address=0x1000000,
+                size=size,
+                allocator=AllocatorType.MALLOC,
+                stack_id=1,
+                n_allocations=1,
+                _stack=[(function, "fun.py", 12), ("parent", "fun.py", 8)],
+            )
+            for function, size in [("small", 1), ("big", 100), ("medium", 10)]
+        ] + [
+            MockAllocationRecord(
+                tid=1,
+                address=0x1000000,
+                size=50,
+                allocator=AllocatorType.MALLOC,
+                stack_id=1,
+                n_allocations=1,
+                _stack=[("small", "fun.py", 12), ("parent", "fun.py", 8)],
+            )
+        ]
+
+        # WHEN
+        reporter = TreeReporter.from_snapshot(peak_allocations, native_traces=False)
+
+        # THEN
+        (parent,) = reporter.data.children.values()
+        assert [
+            (child.location[0], child.value) for child in parent.children.values()
+        ] == [("big", 100), ("small", 51), ("medium", 10)]
+
 
 @dataclass(frozen=True)
 class TreeElement:
@@ -9,11 +9,14 @@ from typing import List
 from typing import Optional
 from typing import Tuple
 from typing import cast
+from unittest.mock import PropertyMock
+from unittest.mock import patch
 
 import pytest
 from rich import print as rprint
 from textual.app import App
 from textual.coordinate import Coordinate
+from textual.geometry import Size
 from textual.pilot import Pilot
 from textual.widget import Widget
 from textual.widgets import DataTable
@@ -426,6 +429,77 @@ class TestGraph:
             "                                                ██",
         )
 
+    def test_graph_is_redrawn_after_adding_a_value(self):
+        # GIVEN
+
+        plot = MemoryGraph(max_data_points=50)
+        plot.add_value(0.5)
+        before = tuple(plot.render_line(i).text for i in range(plot._height))
+        expected = MemoryGraph(max_data_points=50)
+        expected.add_value(0.5)
+        expected.add_value(1.0)
+
+        # WHEN
+
+        plot.add_value(1.0)
+        graph = tuple(plot.render_line(i).text for i in range(plot._height))
+
+        # THEN
+
+        assert graph != before
+        assert graph == tuple(
+            expected.render_line(i).text for i in range(expected._height)
+        )
+
+    def test_graph_is_rescaled_after_a_new_maximum(self):
+        # GIVEN
+
+        values = [0.25, 0.5, 1.0, 0.75, 4.0, 2.0, 3.0]
+        plot = MemoryGraph(max_data_points=50)
+        expected = MemoryGraph(max_data_points=50)
+        for value in values:
+            expected.add_value(value)
+
+        # WHEN
+
+        for value in values:
+            plot.add_value(value)
+            # Draw after every value so that each one is cached on its own
+            tuple(plot.render_line(i).text for i in range(plot._height))
+        graph = tuple(plot.render_line(i).text for i in range(plot._height))
+
+        # THEN
+
+        assert plot._maxval == 4.0
+        assert graph == tuple(
+            expected.render_line(i).text for i in range(expected._height)
+        )
+
+    def test_graph_is_refitted_after_a_resize(self):
+        # GIVEN
+
+        plot = MemoryGraph(max_data_points=50)
+        plot.add_value(100.0)
+        for value in (15, 30, 75):
+            plot.add_value(value)
+        full_graph = tuple(plot.render_line(i).text for i in range(plot._height))
+
+        graphs_by_width = {}
+
+        # WHEN
+
+        with patch.object(MemoryGraph, "size", new_callable=PropertyMock) as size:
+            for width in (20, 60, 20):
+                size.return_value = Size(width, plot._height)
+                graphs_by_width[width] = tuple(
+                    plot.render_line(i).text for i in range(plot._height)
+                )
+
+        # THEN
+
+        assert graphs_by_width[20] == tuple(line[-20:] for line in full_graph)
+        assert graphs_by_width[60] == tuple(line.rjust(60) for line in full_graph)
+
 
 @pytest.mark.parametrize("native_traces", [False, True])
 def test_update_thread(native_traces):
@@ -633,6 +707,117 @@ def test_sorting():
     assert order_by_key["t"] == total_order
 
 
+def test_table_rows_follow_snapshot_changes():
+    """Test that rows are updated, removed and re-added as snapshots change"""
+    # GIVEN
+    first_snapshot = [
+        mock_allocation(size=10, n_allocations=1, stack=[("a", "a.py", 1)]),
+        mock_allocation(size=20, n_allocations=2, stack=[("b", "b.py", 1)]),
+    ]
+    unchanged_snapshot = [
+        mock_allocation(size=10, n_allocations=1, stack=[("a", "a.py", 1)]),
+        mock_allocation(size=20, n_allocations=2, stack=[("b", "b.py", 1)]),
+    ]
+    changed_snapshot = [
+        mock_allocation(size=10, n_allocations=1, stack=[("a", "a.py", 1)]),
+        mock_allocation(size=30, n_allocations=3, stack=[("b", "b.py", 1)]),
+    ]
+    removed_snapshot = [
+        mock_allocation(size=30, n_allocations=3, stack=[("b", "b.py", 1)]),
+    ]
+    snapshots = [
+        first_snapshot,
+        unchanged_snapshot,
+        changed_snapshot,
+        removed_snapshot,
+        changed_snapshot,
+    ]
+
+    reader = MockReader([])
+    app = MockApp(reader)
+    rows_by_snapshot = []
+
+    # WHEN
+    async def run_test():
+        async with app.run_test() as pilot:
+            datatable = pilot.app.query_one(DataTable)
+            function_column, *value_columns, _ = datatable.ordered_columns
+            for snapshot in snapshots:
+                app.add_mock_snapshot(snapshot)
+                await pilot.pause()
+                rows_by_snapshot.append(
+                    {
+                        datatable.get_cell(row.key, function_column.key).plain: tuple(
+                            datatable.get_cell(row.key, column.key).plain
+                            for column in value_columns
+                        )
+                        for row in datatable.ordered_rows
+                    }
+                )
+
+    async_run(run_test())
+
+    # THEN
+    first_rows = {
+        "a": ("10.000B", "33.33%", "10.000B", "33.33%", "1"),
+        "b": ("20.000B", "66.67%", "20.000B", "66.67%", "2"),
+    }
+    changed_rows = {
+        "a": ("10.000B", "25.00%", "10.000B", "25.00%", "1"),
+        "b": ("30.000B", "75.00%", "30.000B", "75.00%", "3"),
+    }
+    assert rows_by_snapshot == [
+        first_rows,
+        first_rows,
+        changed_rows,
+        {"b": ("30.000B", "100.00%", "30.000B", "100.00%", "3")},
+        changed_rows,
+    ]
+
+
+def test_table_rows_are_not_rebuilt_when_only_the_totals_change():
+    """Test that rows which would be drawn the same way keep their cells"""
+    # GIVEN
+    first_snapshot = [
+        mock_allocation(size=10, n_allocations=1, stack=[("a", "a.py", 1)]),
+        mock_allocation(size=999_990, n_allocations=1, stack=[("b", "b.py", 1)]),
+    ]
+    second_snapshot = [
+        mock_allocation(size=10, n_allocations=1, stack=[("a", "a.py", 1)]),
+        mock_allocation(size=999_991, n_allocations=1, stack=[("b", "b.py", 1)]),
+    ]
+
+    reader = MockReader([])
+    app = MockApp(reader)
+    cells_by_snapshot = []
+
+    # WHEN
+    async def run_test():
+        async with app.run_test() as pilot:
+            datatable = pilot.app.query_one(DataTable)
+            for snapshot in (first_snapshot, second_snapshot):
+                app.add_mock_snapshot(snapshot)
+                await pilot.pause()
+                cells_by_snapshot.append(
+                    {
+                        function: datatable.get_row(str((function, f"{function}.py")))
+                        for function in "ab"
+                    }
+                )
+
+    async_run(run_test())
+
+    # THEN
+    first_cells, second_cells = cells_by_snapshot
+    # The heap total changed, but row "a" still shows the same percentages
+    assert all(
+        second is first for first, second in zip(first_cells["a"], second_cells["a"])
+    )
+    # Row "b" grew, so its byte count must have been redrawn
+    assert second_cells["b"][1] is not first_cells["b"][1]
+    assert second_cells["b"][1].value == 999_991
+
+
 def test_switching_threads():
     """Test that we can switch which thread is displayed"""
     # GIVEN